@@ -5,76 +5,102 @@ A super simple FastAPI application that allows students to view and sign up
 for extracurricular activities at Mergington High School.
 """
 
+from dataclasses import asdict, dataclass
 from fastapi import FastAPI, HTTPException
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, Response
+import json
 import os
+import threading
 from pathlib import Path
 
 app = FastAPI(title="Mergington High School API",
               description="API for viewing and signing up for extracurricular activities")
 
+# Serialized /activities body, rebuilt lazily after any change to activities.
+# Handlers run in a threadpool, so building the body and mutating the
+# database both happen under this lock to keep a stale body from being stored.
+# It is reentrant so mutating code can invalidate while already holding it.
+app.state.activities_cache = None
+_activities_lock = threading.RLock()
+
+
+def invalidate_activities_cache():
+    """Drop the cached /activities body; call after any change to activities"""
+    with _activities_lock:
+        app.state.activities_cache = None
+
 # Mount the static files directory
 current_dir = Path(__file__).parent
 app.mount("/static", StaticFiles(directory=os.path.join(Path(__file__).parent,
           "static")), name="static")
 
+
+@dataclass(slots=True)
+class Activity:
+    """An extracurricular activity and its signed-up students"""
+    description: str
+    schedule: str
+    max_participants: int
+    participants: list[str]
+
+
 # In-memory activity database
-activities = {
-    "Chess Club": {
-        "description": "Learn strategies and compete in chess tournaments",
-        "schedule": "Fridays, 3:30 PM - 5:00 PM",
-        "max_participants": 12,
-        "participants": ["michael@mergington.edu", "daniel@mergington.edu"]
-    },
-    "Programming Class": {
-        "description": "Learn programming fundamentals and build software projects",
-        "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
-        "max_participants": 20,
-        "participants": ["emma@mergington.edu", "sophia@mergington.edu"]
-    },
-    "Gym Class": {
-        "description": "Physical education and sports activities",
-        "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
-        "max_participants": 30,
-        "participants": ["john@mergington.edu", "olivia@mergington.edu"]
-    },
-    "Basketball Team": {
-        "description": "Competitive basketball team with practices and games",
-        "schedule": "Mondays and Wednesdays, 4:00 PM - 6:00 PM",
-        "max_participants": 15,
-        "participants": ["alex@mergington.edu", "sarah@mergington.edu"]
-    },
-    "Track and Field": {
-        "description": "Running, jumping, and throwing events training",
-        "schedule": "Tuesdays and Thursdays, 4:00 PM - 5:30 PM",
-        "max_participants": 25,
-        "participants": ["ryan@mergington.edu", "lisa@mergington.edu"]
-    },
-    "Drama Club": {
-        "description": "Theater performances and acting workshops",
-        "schedule": "Thursdays, 3:30 PM - 5:30 PM",
-        "max_participants": 20,
-        "participants": ["grace@mergington.edu", "ethan@mergington.edu"]
-    },
-    "Art Club": {
-        "description": "Painting, drawing, and creative arts projects",
-        "schedule": "Fridays, 3:00 PM - 4:30 PM",
-        "max_participants": 18,
-        "participants": ["maya@mergington.edu", "jacob@mergington.edu"]
-    },
-    "Science Club": {
-        "description": "Science experiments, research projects, and competitions",
-        "schedule": "Wednesdays, 3:30 PM - 5:00 PM",
-        "max_participants": 16,
-        "participants": ["ava@mergington.edu", "noah@mergington.edu"]
-    },
-    "Debate Team": {
-        "description": "Competitive debating and public speaking skills",
-        "schedule": "Mondays, 3:30 PM - 5:00 PM",
-        "max_participants": 14,
-        "participants": ["isabella@mergington.edu", "liam@mergington.edu"]
-    }
+activities: dict[str, Activity] = {
+    "Chess Club": Activity(
+        description="Learn strategies and compete in chess tournaments",
+        schedule="Fridays, 3:30 PM - 5:00 PM",
+        max_participants=12,
+        participants=["michael@mergington.edu", "daniel@mergington.edu"]
+    ),
+    "Programming Class": Activity(
+        description="Learn programming fundamentals and build software projects",
+        schedule="Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
+        max_participants=20,
+        participants=["emma@mergington.edu", "sophia@mergington.edu"]
+    ),
+    "Gym Class": Activity(
+        description="Physical education and sports activities",
+        schedule="Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
+        max_participants=30,
+        participants=["john@mergington.edu", "olivia@mergington.edu"]
+    ),
+    "Basketball Team": Activity(
+        description="Competitive basketball team with practices and games",
+        schedule="Mondays and Wednesdays, 4:00 PM - 6:00 PM",
+        max_participants=15,
+        participants=["alex@mergington.edu", "sarah@mergington.edu"]
+    ),
+    "Track and Field": Activity(
+        description="Running, jumping, and throwing events training",
+        schedule="Tuesdays and Thursdays, 4:00 PM - 5:30 PM",
+        max_participants=25,
+        participants=["ryan@mergington.edu", "lisa@mergington.edu"]
+    ),
+    "Drama Club": Activity(
+        description="Theater performances and acting workshops",
+        schedule="Thursdays, 3:30 PM - 5:30 PM",
+        max_participants=20,
+        participants=["grace@mergington.edu", "ethan@mergington.edu"]
+    ),
+    "Art Club": Activity(
+        description="Painting, drawing, and creative arts projects",
+        schedule="Fridays, 3:00 PM - 4:30 PM",
+        max_participants=18,
+        participants=["maya@mergington.edu", "jacob@mergington.edu"]
+    ),
+    "Science Club": Activity(
+        description="Science experiments, research projects, and competitions",
+        schedule="Wednesdays, 3:30 PM - 5:00 PM",
+        max_participants=16,
+        participants=["ava@mergington.edu", "noah@mergington.edu"]
+    ),
+    "Debate Team": Activity(
+        description="Competitive debating and public speaking skills",
+        schedule="Mondays, 3:30 PM - 5:00 PM",
+        max_participants=14,
+        participants=["isabella@mergington.edu", "liam@mergington.edu"]
+    )
 }
 
 
@@ -85,42 +111,52 @@ def root():
 
 @app.get("/activities")
 def get_activities():
-    return activities
+    with _activities_lock:
+        if app.state.activities_cache is None:
+            app.state.activities_cache = json.dumps(
+                {name: asdict(activity) for name, activity in activities.items()}
+            ).encode()
+        body = app.state.activities_cache
+    return Response(content=body, media_type="application/json")
 
 
 @app.post("/activities/{activity_name}/signup")
 def signup_for_activity(activity_name: str, email: str):
     """Sign up a student for an activity"""
-    # Validate activity exists
-    if activity_name not in activities:
-        raise HTTPException(status_code=404, detail="Activity not found")
+    with _activities_lock:
+        # Validate activity exists
+        if activity_name not in activities:
+            raise HTTPException(status_code=404, detail="Activity not found")
 
-    # Get the specific activity
-    activity = activities[activity_name]
+        # Get the specific activity
+        activity = activities[activity_name]
 
-    # Validate student is not already signed up
-    if email in activity["participants"]:
-        raise HTTPException(status_code=400, detail="Student already signed up for this activity")
+        # Validate student is not already signed up
+        if email in activity.participants:
+            raise HTTPException(status_code=400, detail="Student already signed up for this activity")
 
-    # Add student
-    activity["participants"].append(email)
+        # Add student
+        activity.participants.append(email)
+        invalidate_activities_cache()
     return {"message": f"Signed up {email} for {activity_name}"}
 
 
 @app.delete("/activities/{activity_name}/unregister")
 def unregister_from_activity(activity_name: str, email: str):
     """Unregister a student from an activity"""
-    # Validate activity exists
-    if activity_name not in activities:
-        raise HTTPException(status_code=404, detail="Activity not found")
+    with _activities_lock:
+        # Validate activity exists
+        if activity_name not in activities:
+            raise HTTPException(status_code=404, detail="Activity not found")
 
-    # Get the specific activity
-    activity = activities[activity_name]
+        # Get the specific activity
+        activity = activities[activity_name]
 
-    # Validate student is signed up
-    if email not in activity["participants"]:
-        raise HTTPException(status_code=400, detail="Student is not signed up for this activity")
+        # Validate student is signed up
+        if email not in activity.participants:
+            raise HTTPException(status_code=400, detail="Student is not signed up for this activity")
 
-    # Remove student
-    activity["participants"].remove(email)
+        # Remove student
+        activity.participants.remove(email)
+        invalidate_activities_cache()
     return {"message": f"Unregistered {email} from {activity_name}"}
@@ -3,74 +3,170 @@ Test configuration and fixtures for FastAPI tests
 """
 
 import pytest
-from fastapi.testclient import TestClient
-from src.app import app, activities
+from httpx import ASGITransport, AsyncClient
+
+
+# Canonical activities state, built once at import. Participants are stored
+# as tuples so the snapshot itself can never be mutated by a test.
+_PRISTINE_ACTIVITIES = {
+    "Chess Club": {
+        "description": "Learn strategies and compete in chess tournaments",
+        "schedule": "Fridays, 3:30 PM - 5:00 PM",
+        "max_participants": 12,
+        "participants": ("michael@mergington.edu", "daniel@mergington.edu")
+    },
+    "Programming Class": {
+        "description": "Learn programming fundamentals and build software projects",
+        "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
+        "max_participants": 20,
+        "participants": ("emma@mergington.edu", "sophia@mergington.edu")
+    },
+    "Gym Class": {
+        "description": "Physical education and sports activities",
+        "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
+        "max_participants": 30,
+        "participants": ("john@mergington.edu", "olivia@mergington.edu")
+    },
+    "Basketball Team": {
+        "description": "Competitive basketball team with practices and games",
+        "schedule": "Mondays and Wednesdays, 4:00 PM - 6:00 PM",
+        "max_participants": 15,
+        "participants": ("alex@mergington.edu", "sarah@mergington.edu")
+    },
+    "Track and Field": {
+        "description": "Running, jumping, and throwing events training",
+        "schedule": "Tuesdays and Thursdays, 4:00 PM - 5:30 PM",
+        "max_participants": 25,
+        "participants": ("ryan@mergington.edu", "lisa@mergington.edu")
+    },
+    "Drama Club": {
+        "description": "Theater performances and acting workshops",
+        "schedule": "Thursdays, 3:30 PM - 5:30 PM",
+        "max_participants": 20,
+        "participants": ("grace@mergington.edu", "ethan@mergington.edu")
+    },
+    "Art Club": {
+        "description": "Painting, drawing, and creative arts projects",
+        "schedule": "Fridays, 3:00 PM - 4:30 PM",
+        "max_participants": 18,
+        "participants": ("maya@mergington.edu", "jacob@mergington.edu")
+    },
+    "Science Club": {
+        "description": "Science experiments, research projects, and competitions",
+        "schedule": "Wednesdays, 3:30 PM - 5:00 PM",
+        "max_participants": 16,
+        "participants": ("ava@mergington.edu", "noah@mergington.edu")
+    },
+    "Debate Team": {
+        "description": "Competitive debating and public speaking skills",
+        "schedule": "Mondays, 3:30 PM - 5:00 PM",
+        "max_participants": 14,
+        "participants": ("isabella@mergington.edu", "liam@mergington.edu")
+    }
+}
+
+
+@pytest.fixture(scope="session")
+async def client():
+    """Create a single async test client for the FastAPI app, shared across tests"""
+    from src.app import app
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test",
+                           follow_redirects=True) as test_client:
+        yield test_client
 
 
 @pytest.fixture
-def client():
-    """Create a test client for the FastAPI app"""
-    return TestClient(app)
-
-
-@pytest.fixture(autouse=True)
-def reset_activities():
-    """Reset activities database before each test"""
-    global activities
-    activities.clear()
-    activities.update({
-        "Chess Club": {
-            "description": "Learn strategies and compete in chess tournaments",
-            "schedule": "Fridays, 3:30 PM - 5:00 PM",
-            "max_participants": 12,
-            "participants": ["michael@mergington.edu", "daniel@mergington.edu"]
-        },
-        "Programming Class": {
-            "description": "Learn programming fundamentals and build software projects",
-            "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
-            "max_participants": 20,
-            "participants": ["emma@mergington.edu", "sophia@mergington.edu"]
-        },
-        "Gym Class": {
-            "description": "Physical education and sports activities",
-            "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
-            "max_participants": 30,
-            "participants": ["john@mergington.edu", "olivia@mergington.edu"]
-        },
-        "Basketball Team": {
-            "description": "Competitive basketball team with practices and games",
-            "schedule": "Mondays and Wednesdays, 4:00 PM - 6:00 PM",
-            "max_participants": 15,
-            "participants": ["alex@mergington.edu", "sarah@mergington.edu"]
-        },
-        "Track and Field": {
-            "description": "Running, jumping, and throwing events training",
-            "schedule": "Tuesdays and Thursdays, 4:00 PM - 5:30 PM",
-            "max_participants": 25,
-            "participants": ["ryan@mergington.edu", "lisa@mergington.edu"]
-        },
-        "Drama Club": {
-            "description": "Theater performances and acting workshops",
-            "schedule": "Thursdays, 3:30 PM - 5:30 PM",
-            "max_participants": 20,
-            "participants": ["grace@mergington.edu", "ethan@mergington.edu"]
-        },
-        "Art Club": {
-            "description": "Painting, drawing, and creative arts projects",
-            "schedule": "Fridays, 3:00 PM - 4:30 PM",
-            "max_participants": 18,
-            "participants": ["maya@mergington.edu", "jacob@mergington.edu"]
-        },
-        "Science Club": {
-            "description": "Science experiments, research projects, and competitions",
-            "schedule": "Wednesdays, 3:30 PM - 5:00 PM",
-            "max_participants": 16,
-            "participants": ["ava@mergington.edu", "noah@mergington.edu"]
-        },
-        "Debate Team": {
-            "description": "Competitive debating and public speaking skills",
-            "schedule": "Mondays, 3:30 PM - 5:00 PM",
-            "max_participants": 14,
-            "participants": ["isabella@mergington.edu", "liam@mergington.edu"]
-        }
-    })
\ No newline at end of file
+async def activities_snapshot(client):
+    """Fetch and parse /activities once for read-only assertions"""
+    response = await client.get("/activities")
+    assert response.status_code == 200
+    return response.json()
+
+
+def _pristine_activities_copy():
+    """Build a fresh, mutable copy of the canonical activities state"""
+    from src.app import Activity
+
+    return {
+        name: Activity(
+            description=details["description"],
+            schedule=details["schedule"],
+            max_participants=details["max_participants"],
+            participants=list(details["participants"]),
+        )
+        for name, details in _PRISTINE_ACTIVITIES.items()
+    }
+
+
+@pytest.fixture
+def activities_store():
+    """Return the app's in-memory activities database
+
+    The app is imported here rather than at module level so that collection
+    (e.g. ``--collect-only`` or ``-k`` runs) does not import FastAPI.
+    """
+    from src.app import activities
+
+    return activities
+
+
+@pytest.fixture
+def reset_activities(activities_store):
+    """Reset activities database before a test that modifies it"""
+    from src.app import invalidate_activities_cache
+
+    activities_store.clear()
+    activities_store.update(_pristine_activities_copy())
+    invalidate_activities_cache()
+
+
+@pytest.fixture
+def activity_state(request, activities_store):
+    """Arrange a single activity/participant precondition for a parametrized case
+
+    ``request.param`` is ``(activity, email, registered)``: ``registered`` of
+    True or False ensures the email is or is not a participant, and None
+    ensures the activity does not exist. Only that activity is touched and it
+    is restored afterwards, so cases do not need a full database reset.
+    """
+    from src.app import invalidate_activities_cache
+
+    activity, email, registered = request.param
+    if registered is None:
+        existing = activities_store.pop(activity, None)
+    else:
+        existing = activities_store[activity]
+    saved_participants = None if existing is None else list(existing.participants)
+
+    if registered is True and email not in existing.participants:
+        existing.participants.append(email)
+    elif registered is False and email in existing.participants:
+        existing.participants.remove(email)
+    invalidate_activities_cache()
+
+    yield activity, email
+
+    if existing is not None:
+        existing.participants[:] = saved_participants
+        activities_store[activity] = existing
+    invalidate_activities_cache()
+
+
+@pytest.fixture
+def special_char_activity(reset_activities, activities_store):
+    """Add an activity whose name needs URL encoding and return its name"""
+    from src.app import Activity, invalidate_activities_cache
+
+    name = "Art & Crafts Club"
+    activities_store[name] = Activity(
+        description="Arts and crafts activities",
+        schedule="Fridays, 2:00 PM - 4:00 PM",
+        max_participants=15,
+        participants=[]
+    )
+    invalidate_activities_cache()
+    yield name
+    activities_store.pop(name, None)
+    invalidate_activities_cache()
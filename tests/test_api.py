@@ -2,23 +2,39 @@
 Tests for the Mergington High School Activities API endpoints
 """
 
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from urllib.parse import quote
+
 import pytest
-from fastapi.testclient import TestClient
 
+if TYPE_CHECKING:
+    from httpx import AsyncClient
+
+_REQUIRED_FIELDS = frozenset(("description", "schedule", "max_participants", "participants"))
+
+
+def signup_url(activity, email):
+    """Build a URL-encoded signup endpoint path"""
+    return f"/activities/{quote(activity)}/signup?email={quote(email)}"
+
+
+def unregister_url(activity, email):
+    """Build a URL-encoded unregister endpoint path"""
+    return f"/activities/{quote(activity)}/unregister?email={quote(email)}"
 
-def test_root_redirect(client: TestClient):
+
+async def test_root_redirect(client: AsyncClient):
     """Test that root path redirects to static/index.html"""
-    response = client.get("/")
+    response = await client.get("/")
     assert response.status_code == 200
-    # The redirect should be followed automatically by TestClient
+    # The client is configured to follow the redirect
 
 
-def test_get_activities(client: TestClient):
+async def test_get_activities(activities_snapshot):
     """Test getting all activities"""
-    response = client.get("/activities")
-    assert response.status_code == 200
-    
-    data = response.json()
+    data = activities_snapshot
     assert isinstance(data, dict)
     assert "Chess Club" in data
     assert "Programming Class" in data
@@ -32,132 +48,82 @@ def test_get_activities(client: TestClient):
     assert isinstance(chess_club["participants"], list)
 
 
-def test_signup_for_activity_success(client: TestClient):
-    """Test successful signup for an activity"""
-    response = client.post(
-        "/activities/Chess Club/signup?email=newstudent@mergington.edu"
-    )
-    assert response.status_code == 200
-    
-    data = response.json()
-    assert "message" in data
-    assert "newstudent@mergington.edu" in data["message"]
-    assert "Chess Club" in data["message"]
-    
-    # Verify the participant was added
-    activities_response = client.get("/activities")
-    activities = activities_response.json()
-    assert "newstudent@mergington.edu" in activities["Chess Club"]["participants"]
+# Each case is ((activity, email, registered), status, substr); the first
+# element is passed indirectly to the activity_state fixture.
+SIGNUP_CASES = [
+    (("Chess Club", "newstudent@mergington.edu", False), 200, "Signed up newstudent@mergington.edu for Chess Club"),
+    (("Nonexistent Club", "student@mergington.edu", None), 404, "Activity not found"),
+    (("Chess Club", "michael@mergington.edu", True), 400, "Student already signed up for this activity"),
+]
 
+UNREGISTER_CASES = [
+    (("Chess Club", "michael@mergington.edu", True), 200, "Unregistered michael@mergington.edu from Chess Club"),
+    (("Nonexistent Club", "student@mergington.edu", None), 404, "Activity not found"),
+    (("Chess Club", "notregistered@mergington.edu", False), 400, "Student is not signed up for this activity"),
+]
 
-def test_signup_for_nonexistent_activity(client: TestClient):
-    """Test signup for an activity that doesn't exist"""
-    response = client.post(
-        "/activities/Nonexistent Club/signup?email=student@mergington.edu"
-    )
-    assert response.status_code == 404
-    
-    data = response.json()
-    assert data["detail"] == "Activity not found"
 
+@pytest.mark.parametrize("activity_state,status,substr", SIGNUP_CASES, indirect=["activity_state"])
+async def test_signup(client: AsyncClient, activities_store, activity_state, status, substr):
+    """Test signup success and error responses"""
+    activity, email = activity_state
+    response = await client.post(signup_url(activity, email))
+    assert response.status_code == status
 
-def test_signup_already_registered(client: TestClient):
-    """Test signup when student is already registered"""
-    response = client.post(
-        "/activities/Chess Club/signup?email=michael@mergington.edu"
-    )
-    assert response.status_code == 400
-    
     data = response.json()
-    assert data["detail"] == "Student already signed up for this activity"
+    if status == 200:
+        assert substr in data["message"]
 
+        # Verify the participant was added
+        assert email in activities_store[activity].participants
+    else:
+        assert substr in data["detail"]
 
-def test_signup_special_characters_in_activity_name(client: TestClient):
+
+async def test_signup_special_characters_in_activity_name(client: AsyncClient, special_char_activity):
     """Test signup with special characters in activity name (URL encoding)"""
-    # First add an activity with special characters for testing
-    from src.app import activities
-    activities["Art & Crafts Club"] = {
-        "description": "Arts and crafts activities",
-        "schedule": "Fridays, 2:00 PM - 4:00 PM",
-        "max_participants": 15,
-        "participants": []
-    }
-    
-    response = client.post(
-        "/activities/Art & Crafts Club/signup?email=artist@mergington.edu"
-    )
+    response = await client.post(signup_url(special_char_activity, "artist@mergington.edu"))
     assert response.status_code == 200
 
 
-def test_unregister_from_activity_success(client: TestClient):
-    """Test successful unregistration from an activity"""
-    response = client.delete(
-        "/activities/Chess Club/unregister?email=michael@mergington.edu"
-    )
-    assert response.status_code == 200
-    
-    data = response.json()
-    assert "message" in data
-    assert "michael@mergington.edu" in data["message"]
-    assert "Chess Club" in data["message"]
-    
-    # Verify the participant was removed
-    activities_response = client.get("/activities")
-    activities = activities_response.json()
-    assert "michael@mergington.edu" not in activities["Chess Club"]["participants"]
+@pytest.mark.parametrize("activity_state,status,substr", UNREGISTER_CASES, indirect=["activity_state"])
+async def test_unregister(client: AsyncClient, activities_store, activity_state, status, substr):
+    """Test unregister success and error responses"""
+    activity, email = activity_state
+    response = await client.delete(unregister_url(activity, email))
+    assert response.status_code == status
 
-
-def test_unregister_from_nonexistent_activity(client: TestClient):
-    """Test unregister from an activity that doesn't exist"""
-    response = client.delete(
-        "/activities/Nonexistent Club/unregister?email=student@mergington.edu"
-    )
-    assert response.status_code == 404
-    
     data = response.json()
-    assert data["detail"] == "Activity not found"
+    if status == 200:
+        assert substr in data["message"]
 
-
-def test_unregister_not_registered(client: TestClient):
-    """Test unregister when student is not registered"""
-    response = client.delete(
-        "/activities/Chess Club/unregister?email=notregistered@mergington.edu"
-    )
-    assert response.status_code == 400
-    
-    data = response.json()
-    assert data["detail"] == "Student is not signed up for this activity"
+        # Verify the participant was removed
+        assert email not in activities_store[activity].participants
+    else:
+        assert substr in data["detail"]
 
 
-def test_signup_and_unregister_workflow(client: TestClient):
+async def test_signup_and_unregister_workflow(client: AsyncClient, activities_store, reset_activities):
     """Test complete workflow of signup and then unregister"""
     email = "testworkflow@mergington.edu"
     activity = "Programming Class"
     
     # First signup
-    signup_response = client.post(
-        f"/activities/{activity}/signup?email={email}"
-    )
+    signup_response = await client.post(signup_url(activity, email))
     assert signup_response.status_code == 200
     
-    # Verify participant was added
-    activities_response = client.get("/activities")
-    activities = activities_response.json()
-    assert email in activities[activity]["participants"]
+    # Verify participant was appended
+    assert activities_store[activity].participants[-1] == email
     
     # Then unregister
-    unregister_response = client.delete(
-        f"/activities/{activity}/unregister?email={email}"
-    )
+    unregister_response = await client.delete(unregister_url(activity, email))
     assert unregister_response.status_code == 200
     
     # Verify participant was removed
-    activities_response = client.get("/activities")
-    activities = activities_response.json()
-    assert email not in activities[activity]["participants"]
+    assert email not in activities_store[activity].participants
 
 
-def test_multiple_signups_different_activities(client: TestClient):
+async def test_multiple_signups_different_activities(client: AsyncClient, activities_store, reset_activities):
     """Test that a student can sign up for multiple different activities"""
     email = "multisport@mergington.edu"
     
@@ -165,24 +131,45 @@ def test_multiple_signups_different_activities(client: TestClient):
     activities = ["Chess Club", "Programming Class", "Art Club"]
     
     for activity in activities:
-        response = client.post(
-            f"/activities/{activity}/signup?email={email}"
-        )
+        response = await client.post(signup_url(activity, email))
         assert response.status_code == 200
     
     # Verify student is in all activities
-    activities_response = client.get("/activities")
-    all_activities = activities_response.json()
-    
+    participant_sets = {a: set(activities_store[a].participants) for a in activities}
     for activity in activities:
-        assert email in all_activities[activity]["participants"]
+        assert email in participant_sets[activity]
+
 
+async def test_get_activities_reflects_signup(client: AsyncClient, reset_activities):
+    """Test that /activities is refreshed after a signup invalidates its cache"""
+    email = "cachecheck@mergington.edu"
+    before = (await client.get("/activities")).json()
+    assert email not in before["Chess Club"]["participants"]
 
-def test_participant_count_limits(client: TestClient):
+    response = await client.post(signup_url("Chess Club", email))
+    assert response.status_code == 200
+
+    after = (await client.get("/activities")).json()
+    assert email in after["Chess Club"]["participants"]
+
+
+async def test_get_activities_reflects_unregister(client: AsyncClient, reset_activities):
+    """Test that /activities is refreshed after an unregister invalidates its cache"""
+    email = "michael@mergington.edu"
+    before = (await client.get("/activities")).json()
+    assert email in before["Chess Club"]["participants"]
+
+    response = await client.delete(unregister_url("Chess Club", email))
+    assert response.status_code == 200
+
+    after = (await client.get("/activities")).json()
+    assert email not in after["Chess Club"]["participants"]
+
+
+async def test_participant_count_limits(activities_snapshot):
     """Test that participant limits are respected (though not enforced in current implementation)"""
     # Get initial participant count for Chess Club (max 12)
-    activities_response = client.get("/activities")
-    activities = activities_response.json()
+    activities = activities_snapshot
     initial_count = len(activities["Chess Club"]["participants"])
     max_participants = activities["Chess Club"]["max_participants"]
     
@@ -191,10 +178,10 @@ def test_participant_count_limits(client: TestClient):
     assert initial_count <= max_participants
 
 
-def test_email_validation_format(client: TestClient):
+async def test_email_validation_format(client: AsyncClient, reset_activities):
     """Test various email formats (basic validation via query parameter)"""
     # Valid email
-    response = client.post(
+    response = await client.post(
         "/activities/Chess Club/signup?email=valid@mergington.edu"
     )
     assert response.status_code == 200
@@ -203,17 +190,13 @@ def test_email_validation_format(client: TestClient):
     # Additional email validation could be added to the endpoint if needed
 
 
-def test_activity_data_structure_consistency(client: TestClient):
+async def test_activity_data_structure_consistency(activities_snapshot):
     """Test that all activities have consistent data structure"""
-    response = client.get("/activities")
-    assert response.status_code == 200
-    
-    activities = response.json()
-    required_fields = ["description", "schedule", "max_participants", "participants"]
-    
+    activities = activities_snapshot
+
     for activity_name, activity_data in activities.items():
-        for field in required_fields:
-            assert field in activity_data, f"Activity '{activity_name}' missing field '{field}'"
+        missing = _REQUIRED_FIELDS - activity_data.keys()
+        assert not missing, f"Activity '{activity_name}' missing fields {sorted(missing)}"
         
         assert isinstance(activity_data["participants"], list)
         assert isinstance(activity_data["max_participants"], int)